@@ -1,5 +1,25 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from mysite.admin import ScalableAdminMixin
+
+from .deletion import deactivate_user
 from .models import User
 
-admin.site.register(User)
+
+@admin.register(User)
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
+    list_display = ("id", "username", "email", "is_staff", "date_joined")
+    search_fields = ("username",)
+
+    # Deleting cascades through every tweet, like and follow of the user in one transaction,
+    # so the admin deactivates instead and purge_deactivated_users removes the rows later.
+    def delete_model(self, request, obj):
+        deactivate_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            deactivate_user(user)
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
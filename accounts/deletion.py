@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from tweets.archive import delete_tweets
+from tweets.models import ArchivedTweet, Like, Tweet
+
+from .models import FriendShip, UserSession
+
+
+def deactivate_user(user):
+    """Lock ``user`` out right away and leave their rows to ``purge_user``."""
+    user.is_active = False
+    user.deactivated_at = timezone.now()
+    user.save(update_fields=["is_active", "deactivated_at"])
+
+
+def pk_batches(queryset, batch_size):
+    # Every batch is deleted before the next one is read, so the first rows are always new.
+    while True:
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+
+
+def purge_user(user, batch_size):
+    """Delete the rows of a deactivated ``user``, one transaction per batch.
+
+    Yields ``(model label, count)`` for every batch so the caller can pause between them
+    and let other writers take the database lock.
+    """
+    yield from purge_sessions(user, batch_size)
+    for model in (Tweet, ArchivedTweet):
+        for pks in pk_batches(model.objects.filter(user=user), batch_size):
+            with transaction.atomic():
+                delete_tweets(pks)
+            yield model._meta.label, len(pks)
+    for pks in pk_batches(Like.objects.filter(user=user), batch_size):
+        with transaction.atomic():
+            Like.objects.filter(pk__in=pks).delete()
+        yield Like._meta.label, len(pks)
+    friendships = FriendShip.objects.filter(Q(follower=user) | Q(following=user))
+    for pks in pk_batches(friendships, batch_size):
+        with transaction.atomic():
+            FriendShip.objects.filter(pk__in=pks).delete()
+        yield FriendShip._meta.label, len(pks)
+    user.delete()
+    yield user._meta.label, 1
+
+
+def purge_sessions(user, batch_size):
+    """Delete the database sessions of ``user`` by the keys recorded at login."""
+    database_sessions = settings.SESSION_ENGINE == "django.contrib.sessions.backends.db"
+    for pks in pk_batches(UserSession.objects.filter(user=user), batch_size):
+        with transaction.atomic():
+            user_sessions = UserSession.objects.filter(pk__in=pks)
+            count = 0
+            if database_sessions:
+                count, _ = Session.objects.filter(session_key__in=user_sessions.values("session_key")).delete()
+            user_sessions.delete()
+        if count:
+            yield Session._meta.label, count
@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from accounts.deletion import purge_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Delete the tweets, likes, follows, sessions and rows of deactivated users in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--sleep", type=float, default=0.05, help="Seconds to wait between batches.")
+
+    def handle(self, *args, **options):
+        deactivated = User.objects.filter(is_active=False, deactivated_at__isnull=False)
+        users = list(deactivated)
+        if not users:
+            self.stdout.write("No deactivated users")
+            return
+        deleted = {}
+        purged = 0
+        for user in users:
+            # Purging takes a while, so an account reactivated since the list was read is left alone.
+            if not deactivated.filter(pk=user.pk).exists():
+                self.stdout.write(f"Skipped {user.username}: no longer deactivated")
+                continue
+            for label, count in purge_user(user, options["batch_size"]):
+                deleted[label] = deleted.get(label, 0) + count
+                self.stdout.write(f"Deleted {count} {label}")
+                time.sleep(options["sleep"])
+            purged += 1
+        summary = ", ".join(f"{count} {label}" for label, count in deleted.items())
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} users: {summary}"))
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_friendship"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
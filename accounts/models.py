@@ -4,6 +4,22 @@ from django.db import models
 
 class User(AbstractUser):
     email = models.EmailField()
+    # Set when the account is deleted; purge_deactivated_users removes the rest later.
+    deactivated_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
 
-# class FriendShip(models.Model):
+class FriendShip(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name="following")
+    following = models.ForeignKey(User, on_delete=models.CASCADE, related_name="followers")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["follower", "following"], name="unique_friendship"),
+        ]
+
+
+class UserSession(models.Model):
+    # Sessions store the user id in encoded data, so this index finds a user's sessions without decoding them.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sessions")
+    session_key = models.CharField(max_length=40, unique=True)
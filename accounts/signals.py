@@ -0,0 +1,17 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.dispatch import receiver
+
+from .models import UserSession
+
+
+@receiver(user_logged_in)
+def record_session(sender, request, user, **kwargs):
+    # Cookie-based sessions have no key and nothing to delete later.
+    if request.session.session_key:
+        UserSession.objects.get_or_create(session_key=request.session.session_key, defaults={"user": user})
+
+
+@receiver(user_logged_out)
+def forget_session(sender, request, user, **kwargs):
+    if request.session.session_key:
+        UserSession.objects.filter(session_key=request.session.session_key).delete()
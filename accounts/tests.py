@@ -1,7 +1,21 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
 from django.conf import settings
 from django.contrib.auth import SESSION_KEY, get_user_model
-from django.test import TestCase
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
 from django.urls import reverse
+from django.utils import timezone
+
+from tweets.models import ArchivedTweet, Like, Tweet
+
+from . import deletion
+from .deletion import deactivate_user
+from .models import FriendShip, UserSession
 
 User = get_user_model()
 
@@ -286,8 +300,165 @@ class TestLogoutView(TestCase):
         self.assertNotIn(SESSION_KEY, self.client.session)
 
 
-# class TestUserProfileView(TestCase):
-#     def test_success_get(self):
+class TestUserProfileView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.url = reverse("accounts:user_profile", kwargs={"username": "testuser"})
+
+    def test_success_get(self):
+        tweet = Tweet.objects.create(user=self.user, content="hello")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "accounts/profile.html")
+        self.assertEqual(response.context["profile_user"], self.user)
+        self.assertEqual(response.context["tweets"], [tweet])
+
+    def test_success_get_with_archived_tweets(self):
+        tweets = [Tweet.objects.create(user=self.user, content=f"tweet {i}") for i in range(3)]
+        Tweet.objects.filter(pk=tweets[0].pk).update(created_at=timezone.now() - timedelta(days=60))
+        call_command("archive_tweets", stdout=StringIO())
+
+        response = self.client.get(self.url, {"before": tweets[1].pk})
+        self.assertEqual([tweet.pk for tweet in response.context["tweets"]], [tweets[0].pk])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_failure_get_with_not_exists_user(self):
+        response = self.client.get(reverse("accounts:user_profile", kwargs={"username": "nouser"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_failure_get_with_invalid_cursor(self):
+        for before in ["99999999999999999999999", str(2**63), "0", "-1", "abc", ""]:
+            with self.subTest(before=before):
+                response = self.client.get(self.url, {"before": before})
+                self.assertEqual(response.status_code, 404)
+
+    def test_success_get_with_largest_cursor(self):
+        tweet = Tweet.objects.create(user=self.user, content="hello")
+
+        response = self.client.get(self.url, {"before": str(2**63 - 1)})
+        self.assertEqual(response.context["tweets"], [tweet])
+
+
+class TestUserAdmin(TestCase):
+    def setUp(self):
+        User.objects.create_superuser(username="admin", password="testpassword")
+        User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="admin", password="testpassword")
+        self.url = reverse("admin:accounts_user_changelist")
+
+    def test_success_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "admin/keyset_change_list.html")
+        self.assertEqual([user.username for user in response.context["cl"].result_list], ["testuser", "admin"])
+
+    def test_success_get_with_prefix_search(self):
+        response = self.client.get(self.url, {"q": "test"})
+        self.assertEqual([user.username for user in response.context["cl"].result_list], ["testuser"])
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+    @skipUnless(connection.vendor == "sqlite", "Checks the SQLite query plan")
+    def test_prefix_search_uses_index(self):
+        response = self.client.get(self.url, {"q": "test"})
+        plan = response.context["cl"].queryset.explain()
+        self.assertIn(
+            "SEARCH accounts_user USING INDEX sqlite_autoindex_accounts_user_1 (username>? AND username<?)", plan
+        )
+        self.assertNotIn("SCAN accounts_user", plan)
+
+
+class TestUserDeleteView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.url = reverse("accounts:delete")
+
+    def test_success_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "accounts/delete.html")
+
+    def test_success_post(self):
+        Tweet.objects.create(user=self.user, content="hello")
+
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse(settings.LOGOUT_REDIRECT_URL), status_code=302, target_status_code=200)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertIsNotNone(self.user.deactivated_at)
+        self.assertTrue(Tweet.objects.filter(user=self.user).exists())
+        self.assertFalse(self.client.login(username="testuser", password="testpassword"))
+
+
+class TestPurgeDeactivatedUsersCommand(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.other = User.objects.create_user(username="other", password="testpassword")
+
+    def test_purge_in_batches(self):
+        tweets = [Tweet.objects.create(user=self.user, content=f"tweet {i}") for i in range(3)]
+        archived = ArchivedTweet.from_tweet(tweets[0])
+        Tweet.objects.filter(pk=tweets[0].pk).delete()
+        archived.save()
+        other_tweet = Tweet.objects.create(user=self.other, content="other")
+        Like.objects.create(user=self.user, tweet=other_tweet)
+        Like.objects.create(user=self.other, tweet=tweets[1])
+        FriendShip.objects.create(follower=self.user, following=self.other)
+        FriendShip.objects.create(follower=self.other, following=self.user)
+        self.client.login(username="testuser", password="testpassword")
+        other_client = Client()
+        other_client.login(username="other", password="testpassword")
+        deactivate_user(self.user)
+
+        out = StringIO()
+        call_command("purge_deactivated_users", batch_size=1, sleep=0, stdout=out)
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(list(Tweet.objects.all()), [other_tweet])
+        self.assertFalse(ArchivedTweet.objects.exists())
+        self.assertFalse(Like.objects.exists())
+        self.assertFalse(FriendShip.objects.exists())
+        self.assertEqual(Session.objects.get().session_key, other_client.session.session_key)
+        self.assertEqual(UserSession.objects.get().user, self.other)
+        self.assertIn("Deleted 1 tweets.Tweet", out.getvalue())
+        self.assertIn("Purged 1 users: 1 sessions.Session, 2 tweets.Tweet, 1 tweets.ArchivedTweet", out.getvalue())
+
+    def test_skip_users_reactivated_during_purge(self):
+        deactivate_user(self.user)
+        deactivate_user(self.other)
+        purge_user = deletion.purge_user
+
+        def reactivate_other(user, batch_size):
+            User.objects.filter(pk=self.other.pk).update(is_active=True, deactivated_at=None)
+            return purge_user(user, batch_size)
+
+        out = StringIO()
+        with mock.patch("accounts.management.commands.purge_deactivated_users.purge_user", reactivate_other):
+            call_command("purge_deactivated_users", sleep=0, stdout=out)
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertTrue(User.objects.filter(pk=self.other.pk).exists())
+        self.assertIn("Skipped other: no longer deactivated", out.getvalue())
+        self.assertIn("Purged 1 users", out.getvalue())
+
+    def test_keep_active_users(self):
+        Tweet.objects.create(user=self.user, content="hello")
+
+        call_command("purge_deactivated_users", stdout=StringIO())
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Tweet.objects.count(), 1)
+
+    def test_admin_delete_deactivates(self):
+        User.objects.create_superuser(username="admin", password="testpassword")
+        self.client.login(username="admin", password="testpassword")
+
+        response = self.client.post(reverse("admin:accounts_user_delete", args=[self.user.pk]), {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
 
 
 # class TestUserProfileEditView(TestCase):
@@ -1,10 +1,18 @@
-from django.contrib.auth import authenticate, login
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, TemplateView
 
+from tweets.archive import user_tweets
+
+from .deletion import deactivate_user
 from .forms import SignupForm
 
+User = get_user_model()
+
 
 class SignupView(CreateView):
     form_class = SignupForm
@@ -20,5 +28,37 @@ class SignupView(CreateView):
         return response
 
 
+class UserDeleteView(LoginRequiredMixin, TemplateView):
+    template_name = "accounts/delete.html"
+
+    def post(self, request, *args, **kwargs):
+        deactivate_user(request.user)
+        logout(request)
+        return redirect(settings.LOGOUT_REDIRECT_URL)
+
+
 class UserProfileView(LoginRequiredMixin, TemplateView):
     template_name = "accounts/profile.html"
+    paginate_by = 20
+
+    def get_cursor(self):
+        before = self.request.GET.get("before")
+        if before is None:
+            return None
+        try:
+            before = int(before)
+        except ValueError:
+            raise Http404
+        # Tweet ids are BigAutoField values, so anything outside a signed 64-bit integer cannot match.
+        if not 0 < before < 2**63:
+            raise Http404
+        return before
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        profile_user = get_object_or_404(User, username=self.kwargs["username"], is_active=True)
+        tweets = user_tweets(profile_user, before=self.get_cursor(), limit=self.paginate_by)
+        context["profile_user"] = profile_user
+        context["tweets"] = tweets
+        context["next_cursor"] = tweets[-1].pk if len(tweets) == self.paginate_by else None
+        return context
@@ -0,0 +1,165 @@
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Max, Q
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(queryset):
+    """Return ``(count, kind)`` for the table of ``queryset`` without scanning it.
+
+    ``kind`` is ``"estimate"`` for the planner statistics of PostgreSQL and
+    ``"upper_bound"`` for the largest id, which includes deleted and archived rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return int(row[0]), "estimate"
+    # Ids are only ever appended, so the largest one is read from the primary key index.
+    return queryset.model._default_manager.using(queryset.db).aggregate(count=Max("pk"))["count"] or 0, "upper_bound"
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than ``ADMIN_COUNT_LIMIT`` rows.
+
+    ``count_kind`` tells how ``count`` should be read: ``"exact"``, ``"at_least"``,
+    ``"estimate"`` or ``"upper_bound"``.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            count, self.count_kind = estimated_row_count(self.object_list)
+            return count
+        count = self.object_list.values("pk")[: settings.ADMIN_COUNT_LIMIT].count()
+        self.count_kind = "at_least" if count >= settings.ADMIN_COUNT_LIMIT else "exact"
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """Change list that pages with ``?id__lt=<last id>`` instead of OFFSET.
+
+    The cursor is kept out of the admin filters, so the count always covers the
+    whole filtered list rather than the rows left after the cursor.
+    """
+
+    @property
+    def cursor_param(self):
+        return f"{self.lookup_opts.pk.name}__lt"
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(self.cursor_param, None)
+        return params
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        page = self.queryset
+        if self.cursor_param in self.params:
+            try:
+                cursor = int(self.params[self.cursor_param])
+            except ValueError:
+                raise IncorrectLookupParameters
+            # Larger values overflow the 64-bit integer column.
+            if not 0 < cursor < 2**63:
+                raise IncorrectLookupParameters
+            page = page.filter(pk__lt=cursor)
+        result_list = list(page[: self.list_per_page])
+
+        self.result_count = paginator.count
+        self.count_kind = paginator.count_kind
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = len(result_list) == self.list_per_page
+        self.paginator = paginator
+        self.next_url = None
+        if self.multi_page:
+            self.next_url = self.get_query_string({self.cursor_param: result_list[-1].pk})
+
+
+class ScalableAdminMixin:
+    """Admin options for tables too large for exact counts, OFFSET paging and per-row queries.
+
+    ``search_fields`` must name indexed text columns. They are matched by prefix
+    with a range condition, which the column's index can serve.
+    """
+
+    change_list_template = "admin/keyset_change_list.html"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("-pk",)
+    sortable_by = ()
+    actions = ["delete_in_batches"]
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        # LIKE 'term%' cannot use the index on SQLite, but a range between the term and
+        # the term followed by the largest code point can.
+        query = Q()
+        for field in self.get_search_fields(request):
+            query |= Q(**{f"{field}__gte": search_term, f"{field}__lt": search_term + "\U0010ffff"})
+        return queryset.filter(query), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(permissions=["delete"], description="選択したレコードを少しずつ削除")
+    def delete_in_batches(self, request, queryset):
+        if not request.POST.get("post"):
+            return self.delete_in_batches_confirmation(request, queryset)
+        batch_size = settings.ADMIN_DELETE_BATCH_SIZE
+        queryset = queryset.order_by("pk")
+        deleted = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                objs = self.model._default_manager.filter(pk__in=pks)
+                for obj in objs:
+                    self.log_deletion(request, obj, str(obj))
+                self.delete_queryset(request, objs)
+            deleted += len(pks)
+            last_pk = pks[-1]
+        self.message_user(request, f"{deleted} 件削除しました。", messages.SUCCESS)
+
+    def delete_in_batches_confirmation(self, request, queryset):
+        select_across = request.POST.get("select_across") == "1"
+        # Selecting across pages may match millions of rows, so they are neither listed nor counted exactly.
+        count = queryset.values("pk")[: settings.ADMIN_COUNT_LIMIT].count()
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "本当によろしいですか？",
+            "subtitle": None,
+            "opts": self.model._meta,
+            "objects_name": self.model._meta.verbose_name_plural,
+            "count": count,
+            "count_capped": count >= settings.ADMIN_COUNT_LIMIT,
+            "batch_size": settings.ADMIN_DELETE_BATCH_SIZE,
+            "select_across": select_across,
+            "selected": [] if select_across else request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "media": self.media,
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, "admin/delete_in_batches_confirmation.html", context)
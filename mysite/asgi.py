@@ -13,4 +13,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from tweets.stream import TweetStreamMiddleware
+
+application = TweetStreamMiddleware(django_application)
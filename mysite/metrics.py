@@ -0,0 +1,286 @@
+"""Prometheus-style metrics shared by every worker process.
+
+Each process counts in memory and writes its totals to
+``<METRICS_DIR>/<pid>-<start time>.json`` at most every ``METRICS_FLUSH_INTERVAL``
+seconds. The start time keeps a restarted worker that reuses a pid from
+overwriting the totals of the dead one, so counters never go backwards. The
+``/metrics`` view adds up the files of all processes. It first folds the files
+of processes that exited into ``aggregate.json``, so a scrape reads one file per
+live process however often workers are recycled. Liveness is checked by pid, so
+the directory must not be shared between hosts.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache.backends import locmem
+from django.core.files import locks
+from django.db import connections
+from django.http import HttpResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "django_http_request_duration_seconds": ("histogram", "Time spent handling a request, by URL name."),
+    "django_db_query_duration_seconds": ("histogram", "Time spent in database queries per request, by URL name."),
+    "django_db_queries_total": ("counter", "Database queries executed, by URL name."),
+    "django_cache_requests_total": ("counter", "Cache lookups, by result."),
+    "django_password_hashes_total": ("counter", "Password hashes computed."),
+}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializes writers so an older snapshot never replaces a newer one.
+        self._write_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.started = time.time_ns()
+        self.counters = {}
+        self.histograms = {}
+        self.flushed_at = time.monotonic()
+
+    def _check_fork(self):
+        # A forked worker must not report the totals it inherited from its parent a second time.
+        if os.getpid() != self.pid:
+            self._reset()
+
+    def inc(self, name, labels=(), value=1):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+            histogram[0][bisect_left(BUCKETS, value)] += 1
+            histogram[1] += value
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            # Only the snapshot is taken under the lock; requests keep counting while it is written.
+            with self._lock:
+                self._check_fork()
+                data = {
+                    "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+                    "histograms": [
+                        [name, labels, list(buckets), total]
+                        for (name, labels), (buckets, total) in self.histograms.items()
+                    ],
+                }
+                self.flushed_at = time.monotonic()
+                name = f"{self.pid}-{self.started}"
+            directory = Path(settings.METRICS_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+            write_snapshot(directory / f"{name}.json", data)
+
+
+registry = Registry()
+
+
+def write_snapshot(path, data):
+    path.with_suffix(".tmp").write_text(json.dumps(data))
+    os.replace(path.with_suffix(".tmp"), path)
+
+
+def add_snapshot(path, counters, histograms):
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return
+    for name, labels, value in data["counters"]:
+        key = (name, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, buckets, total in data["histograms"]:
+        key = (name, tuple(map(tuple, labels)))
+        merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+        merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+        merged[1] += total
+
+
+def process_alive(pid):
+    if os.name != "posix":
+        # Without a safe liveness check only the files of reused pids are folded.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fold_dead_processes(directory):
+    """Add the files of processes that exited to ``aggregate.json`` and delete them."""
+    starts = {}
+    for path in directory.glob("*-*.json"):
+        try:
+            pid, started = map(int, path.stem.split("-"))
+        except ValueError:
+            continue
+        starts[path] = (pid, started)
+    newest = {}
+    for pid, started in starts.values():
+        newest[pid] = max(newest.get(pid, started), started)
+    # A file whose pid was reused by a later process is dead even though the pid is running.
+    dead = [path for path, (pid, started) in starts.items() if started < newest[pid] or not process_alive(pid)]
+    if not dead:
+        return
+    aggregate = directory / "aggregate.json"
+    counters = {}
+    histograms = {}
+    for path in [aggregate, *dead]:
+        add_snapshot(path, counters, histograms)
+    write_snapshot(
+        aggregate,
+        {
+            "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+            "histograms": [[name, labels, *histogram] for (name, labels), histogram in histograms.items()],
+        },
+    )
+    for path in dead:
+        path.unlink(missing_ok=True)
+
+
+def collect():
+    """Add up the metrics written by every process."""
+    registry.flush()
+    directory = Path(settings.METRICS_DIR)
+    counters = {}
+    histograms = {}
+    # Other workers may scrape at the same time; the lock keeps a folded file from being read twice.
+    with open(directory / "aggregate.lock", "a") as lock_file:
+        locks.lock(lock_file, locks.LOCK_EX)
+        try:
+            fold_dead_processes(directory)
+            for path in directory.glob("*.json"):
+                add_snapshot(path, counters, histograms)
+        finally:
+            locks.unlock(lock_file)
+    return counters, histograms
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def render(counters, histograms):
+    lines = []
+    for metric, (kind, description) in HELP.items():
+        samples = counters if kind == "counter" else histograms
+        keys = sorted(key for key in samples if key[0] == metric)
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for key in keys:
+            labels = key[1]
+            if kind == "counter":
+                lines.append(f"{metric}{format_labels(labels)} {samples[key]}")
+                continue
+            buckets, total = samples[key]
+            cumulative = 0
+            for bound, count in zip([*BUCKETS, "+Inf"], buckets):
+                cumulative += count
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    return HttpResponse(render(*collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        timer = QueryTimer()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        match = request.resolver_match
+        labels = (("view", match.view_name if match else "<unresolved>"),)
+        registry.observe("django_http_request_duration_seconds", labels, time.perf_counter() - started)
+        registry.observe("django_db_query_duration_seconds", labels, timer.duration)
+        registry.inc("django_db_queries_total", labels, timer.count)
+        registry.maybe_flush()
+        return response
+
+
+class InstrumentedCacheMixin:
+    """Count the hits and misses of ``get`` on a cache backend.
+
+    ``BaseCache.get_many`` looks every key up through ``get``, so it is counted too.
+    """
+
+    _missing = object()
+
+    def _count(self, hits, misses):
+        if hits:
+            registry.inc("django_cache_requests_total", (("result", "hit"),), hits)
+        if misses:
+            registry.inc("django_cache_requests_total", (("result", "miss"),), misses)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        if value is self._missing:
+            self._count(0, 1)
+            return default
+        self._count(1, 0)
+        return value
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """Django's default hasher, counting every hash it computes (``verify`` goes through ``encode``)."""
+
+    def encode(self, password, salt, iterations=None):
+        registry.inc("django_password_hashes_total")
+        return super().encode(password, salt, iterations)
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "mysite.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,6 +85,27 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "mysite.metrics.LocMemCache",
+    }
+}
+
+
+# Password hashing and validation
+# https://docs.djangoproject.com/en/4.0/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    "mysite.metrics.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -132,3 +154,52 @@ LOGOUT_URL = "accounts:logout"
 
 LOGIN_REDIRECT_URL = "tweets:home"
 LOGOUT_REDIRECT_URL = "accounts:login"
+
+
+# Tweet stream (Server-Sent Events)
+
+TWEET_STREAM_BACKEND = "tweets.hub.InProcessBackend"
+TWEET_STREAM_FLUSH_INTERVAL = 0.05
+TWEET_STREAM_QUEUE_SIZE = 100
+TWEET_STREAM_KEEPALIVE = 15
+
+# Tweets older than this are moved to the archive by the archive_tweets command.
+
+TWEET_HOT_WINDOW_DAYS = 30
+
+# Uploaded files
+# https://docs.djangoproject.com/en/4.0/topics/http/file-uploads/
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "media/"
+
+# Stream every upload to a temporary file instead of buffering it in memory.
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+
+TWEET_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+TWEET_THUMBNAIL_SIZES = [120, 480]
+# Every server worker process starts its own pool, so a host runs
+# (server workers) x TWEET_THUMBNAIL_WORKERS render processes. Keep the product
+# near the CPU count; None uses one render process per CPU in every server worker.
+TWEET_THUMBNAIL_WORKERS = 2
+
+# Admin change lists count filtered rows up to this limit and delete in batches of this size.
+
+ADMIN_COUNT_LIMIT = 10000
+ADMIN_DELETE_BATCH_SIZE = 500
+
+# Trending hashtags are counted over TRENDING_WINDOW seconds split into TRENDING_BUCKETS slices.
+
+TRENDING_WINDOW = 60 * 60
+TRENDING_BUCKETS = 12
+TRENDING_SIZE = 10
+TRENDING_REFRESH = 60
+# Database holding the shared hashtag counters, so every worker process sees the same counts.
+TRENDING_DATABASE = "default"
+
+# Metrics served at /metrics. Every worker process writes its totals to METRICS_DIR.
+METRICS_DIR = BASE_DIR / ".metrics"
+METRICS_FLUSH_INTERVAL = 1
+
+# Keeps the metrics of test runs out of METRICS_DIR.
+TEST_RUNNER = "mysite.test_runner.TestRunner"
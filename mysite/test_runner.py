@@ -0,0 +1,19 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run the tests with metrics written to a temporary directory instead of ``METRICS_DIR``."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.metrics_override = override_settings(METRICS_DIR=self.metrics_dir.name)
+        self.metrics_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.metrics_override.disable()
+        self.metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
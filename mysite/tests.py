@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .metrics import collect, registry
+
+User = get_user_model()
+
+
+class TestMetricsView(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.metrics_dir.cleanup)
+        override = override_settings(METRICS_DIR=self.metrics_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        registry.counters.clear()
+        registry.histograms.clear()
+        cache.clear()
+        self.url = reverse("metrics")
+
+    def test_success_get(self):
+        User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.client.get(reverse("tweets:home"))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        body = response.content.decode()
+        self.assertIn("# TYPE django_http_request_duration_seconds histogram", body)
+        self.assertIn('django_http_request_duration_seconds_bucket{view="tweets:home",le="+Inf"} 1', body)
+        self.assertIn('django_http_request_duration_seconds_count{view="tweets:home"} 1', body)
+        self.assertIn('django_db_query_duration_seconds_count{view="tweets:home"} 1', body)
+        self.assertIn("django_password_hashes_total 2", body)
+        self.assertIn('django_cache_requests_total{result="miss"} 1', body)
+
+    def test_cache_hits_and_misses(self):
+        cache.get("key")
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get_many(["key", "other"])
+
+        counters, _ = collect()
+        self.assertEqual(counters[("django_cache_requests_total", (("result", "hit"),))], 2)
+        self.assertEqual(counters[("django_cache_requests_total", (("result", "miss"),))], 2)
+
+    def test_aggregate_worker_processes(self):
+        registry.inc("django_password_hashes_total")
+        with open(os.path.join(self.metrics_dir.name, "1.json"), "w") as f:
+            json.dump({"counters": [["django_password_hashes_total", [], 2]], "histograms": []}, f)
+
+        response = self.client.get(self.url)
+        self.assertIn("django_password_hashes_total 3", response.content.decode())
+
+    def test_restarted_worker_with_same_pid(self):
+        registry.inc("django_password_hashes_total")
+        registry.flush()
+        # A worker that died and was replaced by one with the same pid.
+        with mock.patch("time.time_ns", return_value=registry.started + 1):
+            registry._reset()
+        registry.inc("django_password_hashes_total")
+
+        counters, _ = collect()
+        self.assertEqual(counters[("django_password_hashes_total", ())], 2)
+
+    def test_fold_dead_processes(self):
+        registry.inc("django_password_hashes_total")
+        registry.observe("django_http_request_duration_seconds", (("view", "home"),), 0.1)
+        snapshot = {
+            "counters": [["django_password_hashes_total", [], 2]],
+            "histograms": [["django_http_request_duration_seconds", [["view", "home"]], [1] + [0] * 11, 0.5]],
+        }
+        # Larger than any pid the kernel hands out, and the same pid as this process but started earlier.
+        for name in ["4194305-1.json", f"{registry.pid}-{registry.started - 1}.json"]:
+            with open(os.path.join(self.metrics_dir.name, name), "w") as f:
+                json.dump(snapshot, f)
+
+        for _ in range(2):
+            counters, histograms = collect()
+            self.assertEqual(counters[("django_password_hashes_total", ())], 5)
+            buckets, total = histograms[("django_http_request_duration_seconds", (("view", "home"),))]
+            self.assertEqual(sum(buckets), 3)
+            self.assertAlmostEqual(total, 1.1)
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.metrics_dir.name) if name.endswith(".json")),
+            sorted(["aggregate.json", f"{registry.pid}-{registry.started}.json"]),
+        )
+
+    def test_forked_worker_starts_from_zero(self):
+        registry.inc("django_password_hashes_total")
+        with mock.patch("os.getpid", return_value=registry.pid + 1):
+            registry.inc("django_password_hashes_total")
+            self.assertEqual(registry.counters, {("django_password_hashes_total", ()): 1})
+        registry._reset()
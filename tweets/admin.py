@@ -1 +1,29 @@
-# from django.contrib import admin
+from django.contrib import admin
+
+from mysite.admin import ScalableAdminMixin
+
+from .archive import delete_tweets
+from .models import Like, Tweet
+
+
+@admin.register(Tweet)
+class TweetAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "user", "content", "created_at")
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
+
+    def delete_queryset(self, request, queryset):
+        delete_tweets(queryset.values_list("pk", flat=True))
+
+    def delete_model(self, request, obj):
+        delete_tweets([obj.pk])
+
+
+@admin.register(Like)
+class LikeAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    # tweet_id avoids a join, so likes of archived tweets are listed too.
+    list_display = ("id", "user", "tweet_id", "created_at")
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    raw_id_fields = ("user", "tweet")
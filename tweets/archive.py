@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.db import transaction
+
+from .models import ArchivedTweet, Like, Tweet, TweetImage
+from .thumbnails import delete_image_files
+
+
+def archive_batches(cutoff, batch_size):
+    """Move tweets created before ``cutoff`` to the archive, one transaction per batch.
+
+    Yields the number of tweets moved by each batch.
+    """
+    while True:
+        with transaction.atomic():
+            batch = list(Tweet.objects.filter(created_at__lt=cutoff).order_by("pk")[:batch_size])
+            if not batch:
+                return
+            ArchivedTweet.objects.bulk_create(
+                [ArchivedTweet.from_tweet(tweet) for tweet in batch], ignore_conflicts=True
+            )
+            Tweet.objects.filter(pk__in=[tweet.pk for tweet in batch]).delete()
+        yield len(batch)
+
+
+def delete_tweets(pks):
+    """Delete the given tweets from both tables together with their likes and images.
+
+    The files of an image are deleted once the transaction commits, unless another
+    tweet still uses an image with the same digest.
+    """
+    pks = list(pks)
+    images = TweetImage.objects.filter(tweet_id__in=pks)
+    files = dict(images.values_list("digest", "image"))
+    Like.objects.filter(tweet_id__in=pks).delete()
+    images.delete()
+    Tweet.objects.filter(pk__in=pks).delete()
+    ArchivedTweet.objects.filter(pk__in=pks).delete()
+    shared = set(TweetImage.objects.filter(digest__in=files).values_list("digest", flat=True))
+    for digest, name in files.items():
+        if digest not in shared:
+            transaction.on_commit(partial(delete_image_files, name, digest))
+
+
+def get_tweet(pk):
+    tweet = Tweet.objects.select_related("user").filter(pk=pk).first()
+    if tweet is None:
+        tweet = ArchivedTweet.objects.select_related("user").filter(pk=pk).first()
+    return tweet
+
+
+def user_tweets(user, before=None, limit=20):
+    """Return up to ``limit`` tweets of ``user`` older than the ``before`` id, newest first.
+
+    The archive is only read once the hot table runs out of rows for the page.
+    """
+    tweets = Tweet.objects.filter(user=user)
+    if before is not None:
+        tweets = tweets.filter(pk__lt=before)
+    tweets = list(tweets.order_by("-pk")[:limit])
+    if len(tweets) < limit:
+        archived = ArchivedTweet.objects.filter(user=user)
+        if tweets:
+            before = tweets[-1].pk
+        if before is not None:
+            archived = archived.filter(pk__lt=before)
+        tweets += archived.order_by("-pk")[: limit - len(tweets)]
+    return tweets
@@ -0,0 +1,18 @@
+from django import forms
+from django.conf import settings
+
+from .models import Tweet
+
+
+class TweetCreateForm(forms.ModelForm):
+    image = forms.ImageField(required=False)
+
+    class Meta:
+        model = Tweet
+        fields = ("content",)
+
+    def clean_image(self):
+        image = self.cleaned_data["image"]
+        if image and image.size > settings.TWEET_IMAGE_MAX_SIZE:
+            raise forms.ValidationError("画像のサイズが大きすぎます。")
+        return image
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class InProcessBackend:
+    """Hand published events straight back to the hub of this process.
+
+    Multi-node deployments swap this for a backend that forwards ``publish``
+    to a broker and calls ``hub.deliver`` for every event the broker sends back.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, channels, event):
+        self.hub.deliver(channels, event)
+
+
+class Subscription:
+    def __init__(self, channels, maxsize):
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize)
+
+    def put_batch(self, events):
+        # A client that stopped reading loses its oldest batch instead of growing the queue.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(events)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Hub:
+    """Fan events out to the open streams of this process.
+
+    ``deliver`` may be called from any thread. Events are buffered per channel,
+    coalesced by ``(event, id)`` and flushed as one batch per subscription, over
+    all of its channels, every ``flush_interval`` seconds on the event loop that
+    owns the streams.
+    """
+
+    def __init__(self, backend_class=InProcessBackend, flush_interval=0.05, queue_size=100):
+        self.backend = backend_class(self)
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._pending = {}
+        self._flush_scheduled = False
+        self._loop = None
+
+    def subscribe(self, *channels):
+        subscription = Subscription(channels, self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self._subscribers.pop(channel, None)
+            if not self._subscribers:
+                self._pending = {}
+                self._flush_scheduled = False
+                self._loop = None
+
+    def has_subscribers(self, channel):
+        with self._lock:
+            return channel in self._subscribers
+
+    def publish(self, channels, event):
+        self.backend.publish(list(channels), event)
+
+    def deliver(self, channels, event):
+        key = (event["event"], event["id"])
+        with self._lock:
+            channels = [channel for channel in channels if channel in self._subscribers]
+            if not channels:
+                return
+            for channel in channels:
+                self._pending.setdefault(channel, {})[key] = event
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+            loop = self._loop
+        loop.call_soon_threadsafe(loop.call_later, self.flush_interval, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+            batches = {}
+            for channel, events in pending.items():
+                for subscription in self._subscribers.get(channel, ()):
+                    batches.setdefault(subscription, {}).update(events)
+        for subscription, events in batches.items():
+            subscription.put_batch(list(events.values()))
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = Hub(
+                import_string(settings.TWEET_STREAM_BACKEND),
+                flush_interval=settings.TWEET_STREAM_FLUSH_INTERVAL,
+                queue_size=settings.TWEET_STREAM_QUEUE_SIZE,
+            )
+        return _hub
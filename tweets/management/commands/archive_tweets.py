@@ -0,0 +1,26 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tweets.archive import archive_batches
+
+
+class Command(BaseCommand):
+    help = "Move tweets older than the hot window into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.TWEET_HOT_WINDOW_DAYS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to wait between batches.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        moved = 0
+        for count in archive_batches(cutoff, options["batch_size"]):
+            moved += count
+            self.stdout.write(f"Archived {moved} tweets")
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} tweets older than {cutoff:%Y-%m-%d}"))
@@ -0,0 +1,69 @@
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+from django import forms
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from tweets.thumbnails import THUMBNAIL_DIR, get_executor, render_thumbnails, store_image, thumbnail_name
+
+
+class Command(BaseCommand):
+    help = "Measure upload-to-thumbnail latency and throughput per core on synthetic JPEG images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50)
+        parser.add_argument("--width", type=int, default=3000)
+        parser.add_argument("--height", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["count"] < 1:
+            raise CommandError("--count must be at least 1.")
+        source = BytesIO()
+        Image.linear_gradient("L").resize((options["width"], options["height"])).convert("RGB").save(source, "JPEG")
+        executor = get_executor()
+        workers = settings.TWEET_THUMBNAIL_WORKERS or os.cpu_count()
+        sizes = settings.TWEET_THUMBNAIL_SIZES
+        uploads = iter(range(2 * options["count"]))
+
+        def submit(storage):
+            # Decoders ignore bytes after the end marker; they give every upload its own digest.
+            i = next(uploads)
+            data = source.getvalue() + i.to_bytes(4, "big")
+            upload = forms.ImageField().clean(SimpleUploadedFile(f"{i}.jpg", data))
+            name, digest = store_image(upload, storage)
+            destination = storage.path(thumbnail_name(digest, "{size}"))
+            return executor.submit(render_thumbnails, storage.path(name), destination, sizes)
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = FileSystemStorage(location=directory)
+            os.makedirs(storage.path(THUMBNAIL_DIR))
+            # Warm the worker processes up so spawning them is not measured.
+            list(executor.map(pow, range(workers), range(workers)))
+
+            # One image at a time, so the latency does not include waiting behind other images.
+            latencies = []
+            for _ in range(options["count"]):
+                started = time.perf_counter()
+                submit(storage).result()
+                latencies.append(time.perf_counter() - started)
+
+            # All images at once, so every worker is busy.
+            started = time.perf_counter()
+            futures = [submit(storage) for _ in range(options["count"])]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        throughput = options["count"] / elapsed
+        self.stdout.write(f"images: {options['count']} ({options['width']}x{options['height']}), workers: {workers}")
+        self.stdout.write(f"latency median: {statistics.median(latencies) * 1000:.1f} ms")
+        self.stdout.write(f"latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+        self.stdout.write(f"throughput: {throughput:.1f} images/s, {throughput / workers:.1f} images/s per core")
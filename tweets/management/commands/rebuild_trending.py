@@ -0,0 +1,48 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tweets.models import HashtagCandidate, HashtagSketchCell, Tweet
+from tweets.trending import Bucket, bucket_index, bucket_seconds, compute_trending, extract_hashtags, window_buckets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the trending hashtag counts from the tweets of the current window."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        using = settings.TRENDING_DATABASE
+        window = window_buckets(now.timestamp())
+        # Start at the first bucket of the window: the one before it may still have rows that are not replaced.
+        start = datetime.fromtimestamp(window.start * bucket_seconds(), dt_timezone.utc)
+        buckets = {}
+        tweets = Tweet.objects.filter(created_at__gte=start)
+        for content, created_at in tweets.values_list("content", "created_at").iterator(chunk_size=2000):
+            tags = extract_hashtags(content)
+            if tags:
+                bucket = buckets.setdefault(bucket_index(created_at.timestamp()), Bucket())
+                for tag in tags:
+                    bucket.add(tag)
+
+        cells = []
+        candidates = []
+        for index, bucket in buckets.items():
+            sketch = bucket.sketch
+            for position, count in enumerate(sketch.counts):
+                if count:
+                    row, column = divmod(position, sketch.width)
+                    cells.append(HashtagSketchCell(bucket=index, row=row, column=column, count=count))
+            for tag, estimate in bucket.candidates.items():
+                candidates.append(HashtagCandidate(bucket=index, tag=tag, estimate=estimate))
+        with transaction.atomic(using=using):
+            # Every bucket is replaced, including the ones that slid out of the window.
+            HashtagSketchCell.objects.using(using).all().delete()
+            HashtagCandidate.objects.using(using).all().delete()
+            HashtagSketchCell.objects.using(using).bulk_create(cells, batch_size=1000)
+            HashtagCandidate.objects.using(using).bulk_create(candidates, batch_size=1000)
+        trending = compute_trending(now.timestamp())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(buckets)} buckets, {len(trending)} trending hashtags"))
@@ -0,0 +1,31 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0002_archivedtweet"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TweetImage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("image", models.FileField(upload_to="")),
+                ("digest", models.CharField(db_index=True, max_length=64)),
+                (
+                    "tweet",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="images",
+                        to="tweets.tweet",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.13 on 2026-10-19 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0004_like"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HashtagCandidate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("bucket", models.BigIntegerField()),
+                ("tag", models.CharField(max_length=140)),
+                ("estimate", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="HashtagSketchCell",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("bucket", models.BigIntegerField()),
+                ("row", models.PositiveSmallIntegerField()),
+                ("column", models.PositiveIntegerField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagsketchcell",
+            constraint=models.UniqueConstraint(fields=("bucket", "row", "column"), name="unique_hashtag_sketch_cell"),
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagcandidate",
+            constraint=models.UniqueConstraint(fields=("bucket", "tag"), name="unique_hashtag_candidate"),
+        ),
+    ]
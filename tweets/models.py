@@ -1,4 +1,97 @@
-# from django.db import models
+from django.conf import settings
+from django.db import models
+from django.urls import reverse
 
 
-# class Tweet(models.Model):
+class Tweet(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tweets")
+    content = models.CharField(max_length=140)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class ArchivedTweet(models.Model):
+    """Tweet moved out of the hot table by the ``archive_tweets`` command.
+
+    Rows keep the id they had in ``Tweet`` so URLs and cursors stay valid.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_tweets")
+    content = models.CharField(max_length=140)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @classmethod
+    def from_tweet(cls, tweet):
+        return cls(
+            id=tweet.pk,
+            user_id=tweet.user_id,
+            content=tweet.content,
+            created_at=tweet.created_at,
+        )
+
+    @property
+    def images(self):
+        return TweetImage.objects.filter(tweet_id=self.pk)
+
+
+class TweetImage(models.Model):
+    # No database constraint: images stay attached by id when their tweet moves to ArchivedTweet.
+    tweet = models.ForeignKey(Tweet, on_delete=models.DO_NOTHING, db_constraint=False, related_name="images")
+    image = models.FileField()
+    digest = models.CharField(max_length=64, db_index=True)
+
+    def thumbnail_url(self, size):
+        return reverse("tweets:thumbnail", kwargs={"digest": self.digest, "size": size})
+
+    @property
+    def small_thumbnail_url(self):
+        return self.thumbnail_url(min(settings.TWEET_THUMBNAIL_SIZES))
+
+    @property
+    def large_thumbnail_url(self):
+        return self.thumbnail_url(max(settings.TWEET_THUMBNAIL_SIZES))
+
+
+class Like(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="likes")
+    # Likes stay attached by id when their tweet moves to ArchivedTweet, like TweetImage.
+    tweet = models.ForeignKey(Tweet, on_delete=models.DO_NOTHING, db_constraint=False, related_name="likes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "tweet"], name="unique_like"),
+        ]
+
+
+class HashtagSketchCell(models.Model):
+    """One counter of the count-min sketch of trending hashtags for a time bucket."""
+
+    bucket = models.BigIntegerField()
+    row = models.PositiveSmallIntegerField()
+    column = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "row", "column"], name="unique_hashtag_sketch_cell"),
+        ]
+
+
+class HashtagCandidate(models.Model):
+    """Hashtag likely to trend, with its estimated count in a time bucket."""
+
+    bucket = models.BigIntegerField()
+    tag = models.CharField(max_length=140)
+    estimate = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "tag"], name="unique_hashtag_candidate"),
+        ]
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .hub import get_hub, user_channel
+from .models import Tweet
+from .trending import record_hashtags
+
+
+def publish_tweet(tweet):
+    # Followers' streams subscribe to the author's channel, so publishing never reads the followers.
+    event = {
+        "event": "tweet",
+        "id": tweet.pk,
+        "data": {
+            "id": tweet.pk,
+            "username": tweet.user.username,
+            "content": tweet.content,
+            "created_at": tweet.created_at.isoformat(),
+        },
+    }
+    get_hub().publish([user_channel(tweet.user_id)], event)
+
+
+@receiver(post_save, sender=Tweet)
+def tweet_created(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_tweet(instance))
+        transaction.on_commit(lambda: record_hashtags(instance))
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.http.cookie import parse_cookie
+from django.utils.crypto import constant_time_compare
+
+from accounts.models import FriendShip
+
+from .hub import get_hub, user_channel
+
+STREAM_PATH = "/tweets/stream/"
+
+
+@sync_to_async
+def get_stream_channels(cookie_header):
+    """Return the channels of the logged-in user and of everyone they follow.
+
+    Follows made while the stream is open are picked up when the client reconnects.
+    """
+    session_key = parse_cookie(cookie_header).get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    user_id = session.get(SESSION_KEY)
+    if user_id is None:
+        return None
+    user = get_user_model()._default_manager.filter(pk=user_id, is_active=True).first()
+    if user is None or not constant_time_compare(session.get(HASH_SESSION_KEY, ""), user.get_session_auth_hash()):
+        return None
+    following_ids = FriendShip.objects.filter(follower=user).values_list("following_id", flat=True)
+    return [user_channel(user.pk)] + [user_channel(following_id) for following_id in following_ids]
+
+
+def encode_events(events):
+    return "".join(
+        f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n" for event in events
+    ).encode()
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+class TweetStreamMiddleware:
+    """Serve ``STREAM_PATH`` as Server-Sent Events and pass every other request to Django.
+
+    Each open stream is a coroutine waiting on its subscription queue, so idle
+    connections cost no worker thread.
+    """
+
+    def __init__(self, app, hub=None):
+        self.app = app
+        self.hub = hub
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != STREAM_PATH:
+            return await self.app(scope, receive, send)
+        if scope["method"] != "GET":
+            return await self.respond(send, 405, b"Method Not Allowed")
+        headers = dict(scope["headers"])
+        channels = await get_stream_channels(headers.get(b"cookie", b"").decode("latin-1"))
+        if channels is None:
+            return await self.respond(send, 403, b"Forbidden")
+        await self.stream(receive, send, self.hub or get_hub(), channels)
+
+    async def respond(self, send, status, body):
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def stream(self, receive, send, hub, channels):
+        subscription = hub.subscribe(*channels)
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+            while True:
+                batch = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    {batch, disconnect},
+                    timeout=settings.TWEET_STREAM_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if batch not in done:
+                    batch.cancel()
+                if disconnect in done:
+                    break
+                body = encode_events(batch.result()) if batch in done else b": keepalive\n\n"
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        finally:
+            hub.unsubscribe(subscription)
+            disconnect.cancel()
@@ -1,5 +1,47 @@
-from django.test import TestCase
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django import forms
+from django.conf import settings
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F, Q
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import FriendShip
+
+from .archive import delete_tweets, user_tweets
+from .hub import Hub, user_channel
+from .models import ArchivedTweet, HashtagCandidate, HashtagSketchCell, Like, Tweet, TweetImage
+from .stream import TweetStreamMiddleware
+from .thumbnails import render_thumbnails, store_image, submit_thumbnails, thumbnail_name
+from .trending import (
+    CountMinSketch,
+    bucket_index,
+    bucket_seconds,
+    compute_trending,
+    extract_hashtags,
+    get_trending,
+    record_hashtags,
+)
+
+User = get_user_model()
 
 
 class TestHomeView(TestCase):
@@ -19,18 +61,447 @@ class TestHomeView(TestCase):
         self.assertTemplateUsed(response, "tweets/home.html")
 
 
-# class TestTweetCreateView(TestCase):
-#     def test_success_get(self):
+class TestTrending(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    def create_tweet(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Tweet.objects.create(user=self.user, content=content)
+
+    def test_extract_hashtags(self):
+        self.assertEqual(extract_hashtags("#Django と ＃東京 #django page#anchor"), ["django", "東京"])
+
+    def test_count_min_sketch_never_underestimates(self):
+        sketch = CountMinSketch(width=16, depth=2)
+        for i in range(100):
+            sketch.add(f"tag{i % 10}")
+        for i in range(10):
+            self.assertGreaterEqual(sketch.estimate(f"tag{i}"), 10)
+
+    def test_record_hashtags_on_create(self):
+        for _ in range(3):
+            self.create_tweet("#python")
+        self.create_tweet("#django #python")
+
+        self.assertEqual(compute_trending(), [("python", 4), ("django", 1)])
+
+    def test_window_drops_old_buckets(self):
+        self.create_tweet("#python")
+
+        later = time.time() + settings.TRENDING_WINDOW
+        self.assertEqual(compute_trending(later), [])
+
+    def test_record_hashtags_drops_old_buckets(self):
+        old = self.create_tweet("#old")
+        Tweet.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=1))
+        HashtagSketchCell.objects.update(bucket=F("bucket") - settings.TRENDING_BUCKETS)
+        HashtagCandidate.objects.update(bucket=F("bucket") - settings.TRENDING_BUCKETS)
+
+        self.create_tweet("#python")
+        self.assertEqual(list(HashtagCandidate.objects.values_list("tag", flat=True)), ["python"])
+
+    def test_get_trending_does_not_write(self):
+        self.create_tweet("#python")
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(get_trending(), [("python", 1)])
+        self.assertTrue(all(query["sql"].startswith("SELECT") for query in queries))
+
+    def test_counts_are_kept_in_database(self):
+        self.create_tweet("#python")
+        self.create_tweet("#python")
+
+        sketch = CountMinSketch()
+        cells = HashtagSketchCell.objects.filter(
+            Q(*(Q(row=row, column=column) for row, column in sketch.cells("python")), _connector=Q.OR)
+        )
+        self.assertEqual(list(cells.values_list("count", flat=True)), [2] * sketch.depth)
+        self.assertEqual(HashtagCandidate.objects.get(tag="python").estimate, 2)
+
+    def test_rebuild_trending(self):
+        self.create_tweet("#python")
+        self.create_tweet("#python")
+        old = self.create_tweet("#old")
+        Tweet.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=1))
+        HashtagSketchCell.objects.all().delete()
+        HashtagCandidate.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_trending", stdout=out)
+        self.assertIn("1 trending hashtags", out.getvalue())
+        self.assertEqual(list(HashtagCandidate.objects.values_list("tag", "estimate")), [("python", 2)])
+        # Another process starts with an empty local cache and reads the rebuilt counts from the database.
+        cache.clear()
+        self.assertEqual(get_trending(), [("python", 2)])
+
+    def test_rebuild_trending_keeps_bucket_before_window(self):
+        bucket = bucket_index(time.time())
+        now = datetime.fromtimestamp(bucket * bucket_seconds() + 1, dt_timezone.utc)
+        # Created exactly one window before now, so it belongs to the bucket just before the window.
+        edge = Tweet.objects.create(user=self.user, content="#edge")
+        edge.created_at = now - timedelta(seconds=settings.TRENDING_WINDOW)
+        Tweet.objects.filter(pk=edge.pk).update(created_at=edge.created_at)
+        record_hashtags(edge)
+
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            call_command("rebuild_trending", stdout=StringIO())
+        self.assertEqual(compute_trending(now.timestamp()), [])
+
+    def test_home_view_shows_trending(self):
+        self.create_tweet("#python")
+        self.client.login(username="testuser", password="testpassword")
+
+        response = self.client.get(reverse("tweets:home"))
+        self.assertEqual(response.context["trending"], [("python", 1)])
+        self.assertContains(response, "#python (1)")
+
+
+class LocalBrokerBackend:
+    """Stand-in for a multi-node broker: every hub built with it receives every event."""
+
+    hubs = []
+
+    def __init__(self, hub):
+        self.hubs.append(hub)
+
+    def publish(self, channels, event):
+        for hub in self.hubs:
+            hub.deliver(channels, event)
+
+
+def make_event(pk, content="hello"):
+    return {"event": "tweet", "id": pk, "data": {"id": pk, "content": content}}
 
-#     def test_success_post(self):
 
-#     def test_failure_post_with_empty_content(self):
+async def wait_until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.01)
 
-#     def test_failure_post_with_too_long_content(self):
 
+class TestHub(SimpleTestCase):
+    async def test_publish_to_subscriber(self):
+        hub = Hub(flush_interval=0)
+        subscription = hub.subscribe("user:1")
+        hub.publish(["user:1", "user:2"], make_event(1))
 
-# class TestTweetDetailView(TestCase):
-#     def test_success_get(self):
+        batch = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(batch, [make_event(1)])
+        self.assertFalse(hub.has_subscribers("user:2"))
+
+    async def test_coalesce_events_in_batch(self):
+        hub = Hub(flush_interval=0.01)
+        subscription = hub.subscribe("user:1")
+        hub.publish(["user:1"], make_event(1, "first"))
+        hub.publish(["user:1"], make_event(2))
+        hub.publish(["user:1"], make_event(1, "edited"))
+
+        batch = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(batch, [make_event(1, "edited"), make_event(2)])
+
+    async def test_subscribe_to_several_channels(self):
+        hub = Hub(flush_interval=0.01)
+        subscription = hub.subscribe("user:1", "user:2")
+        hub.publish(["user:1"], make_event(1))
+        hub.publish(["user:2"], make_event(2))
+
+        batch = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(batch, [make_event(1), make_event(2)])
+        hub.unsubscribe(subscription)
+        self.assertFalse(hub.has_subscribers("user:2"))
+
+    async def test_unsubscribe(self):
+        hub = Hub(flush_interval=0)
+        subscription = hub.subscribe("user:1")
+        hub.unsubscribe(subscription)
+
+        self.assertFalse(hub.has_subscribers("user:1"))
+        hub.publish(["user:1"], make_event(1))
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_pluggable_backend(self):
+        LocalBrokerBackend.hubs = []
+        first = Hub(LocalBrokerBackend, flush_interval=0)
+        second = Hub(LocalBrokerBackend, flush_interval=0)
+        subscription = second.subscribe("user:1")
+        first.publish(["user:1"], make_event(1))
+
+        batch = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(batch, [make_event(1)])
+
+
+class TestTweetStream(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    async def call(self, hub, cookie=""):
+        disconnected = asyncio.Event()
+        messages = []
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/tweets/stream/",
+            "headers": [(b"cookie", cookie.encode())],
+        }
+        task = asyncio.ensure_future(TweetStreamMiddleware(None, hub)(scope, receive, send))
+        return task, disconnected, messages
+
+    async def test_failure_get_without_login(self):
+        task, _, messages = await self.call(Hub())
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(messages[0]["status"], 403)
+
+    async def test_success_get(self):
+        author = await User.objects.acreate(username="author")
+        await FriendShip.objects.acreate(follower=self.user, following=author)
+        await sync_to_async(self.client.login)(username="testuser", password="testpassword")
+        cookie = f"{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        hub = Hub(flush_interval=0)
+        task, disconnected, messages = await self.call(hub, cookie)
+        await asyncio.wait_for(wait_until(lambda: hub.has_subscribers(user_channel(author.pk))), 1)
+
+        hub.publish([user_channel(author.pk)], make_event(1))
+        await asyncio.wait_for(wait_until(lambda: len(messages) >= 3), 1)
+        disconnected.set()
+        await asyncio.wait_for(task, 1)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), messages[0]["headers"])
+        self.assertEqual(messages[2]["body"], b'id: 1\nevent: tweet\ndata: {"id": 1, "content": "hello"}\n\n')
+        self.assertFalse(hub.has_subscribers(user_channel(self.user.pk)))
+        self.assertFalse(hub.has_subscribers(user_channel(author.pk)))
+
+    def test_publish_to_author_channel_on_create(self):
+        follower = User.objects.create_user(username="follower", password="testpassword")
+        FriendShip.objects.create(follower=follower, following=self.user)
+
+        with mock.patch("tweets.signals.get_hub") as get_hub:
+            with self.captureOnCommitCallbacks(execute=True):
+                tweet = Tweet.objects.create(user=self.user, content="hello")
+
+        channels, event = get_hub.return_value.publish.call_args.args
+        self.assertEqual(channels, [user_channel(self.user.pk)])
+        self.assertEqual(event["id"], tweet.pk)
+        self.assertEqual(event["data"]["content"], "hello")
+
+
+def make_image(name="image.png", size=(800, 600)):
+    data = BytesIO()
+    Image.new("RGB", size, "blue").save(data, "PNG")
+    return SimpleUploadedFile(name, data.getvalue(), content_type="image/png")
+
+
+def clean_image(uploaded_file):
+    return forms.ImageField().clean(uploaded_file)
+
+
+class TestTweetCreateView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.url = reverse("tweets:create")
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_success_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "tweets/create.html")
+
+    def test_success_post(self):
+        response = self.client.post(self.url, {"content": "hello"})
+        self.assertRedirects(response, reverse("tweets:home"), status_code=302, target_status_code=200)
+        self.assertTrue(Tweet.objects.filter(user=self.user, content="hello").exists())
+
+    def test_success_post_with_image(self):
+        with mock.patch("tweets.thumbnails.get_executor") as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {"content": "hello", "image": make_image()})
+
+        self.assertRedirects(response, reverse("tweets:home"), status_code=302, target_status_code=200)
+        image = TweetImage.objects.get(tweet__content="hello")
+        self.assertEqual(image.image.name, f"tweet_images/{image.digest}.png")
+        self.assertTrue(os.path.exists(image.image.path))
+        get_executor.return_value.submit.assert_called_once_with(
+            render_thumbnails,
+            image.image.path,
+            os.path.join(self.media_root.name, f"tweet_thumbnails/{image.digest}-{{size}}.jpg"),
+            settings.TWEET_THUMBNAIL_SIZES,
+        )
+
+    def test_failure_post_with_empty_content(self):
+        response = self.client.post(self.url, {"content": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Tweet.objects.exists())
+        self.assertEqual(response.context["form"].errors["content"][0], "このフィールドは必須です。")
+
+    def test_failure_post_with_too_long_content(self):
+        response = self.client.post(self.url, {"content": "a" * 141})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Tweet.objects.exists())
+        self.assertIn("content", response.context["form"].errors)
+
+    def test_failure_post_with_invalid_image(self):
+        image = SimpleUploadedFile("image.png", b"not an image", content_type="image/png")
+        response = self.client.post(self.url, {"content": "hello", "image": image})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Tweet.objects.exists())
+        self.assertIn("image", response.context["form"].errors)
+
+
+class TestThumbnailView(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.name, self.digest = store_image(clean_image(make_image()))
+
+    def test_extension_follows_detected_format(self):
+        name, _ = store_image(clean_image(make_image(name="image.jpg", size=(10, 10))))
+        self.assertTrue(name.endswith(".png"))
+
+    def test_render_thumbnails(self):
+        os.makedirs(default_storage.path("tweet_thumbnails"))
+        destination = default_storage.path(thumbnail_name(self.digest, "{size}"))
+        render_thumbnails(default_storage.path(self.name), destination, [120, 480])
+
+        with Image.open(destination.format(size=120)) as small:
+            self.assertEqual(small.size, (120, 90))
+        with Image.open(destination.format(size=480)) as large:
+            self.assertEqual(large.size, (480, 360))
+
+    def test_render_failure_is_logged(self):
+        missing = default_storage.path("tweet_images/missing.jpg")
+        with self.assertLogs("tweets.thumbnails", "ERROR") as logs:
+            future = submit_thumbnails(missing, default_storage.path("{size}.jpg"), [120])
+            with self.assertRaises(FileNotFoundError):
+                future.result()
+            # Done-callbacks may still be running in the executor's thread once result() returns.
+            for _ in range(100):
+                if logs.records:
+                    break
+                time.sleep(0.01)
+        self.assertIn(missing, logs.output[0])
+
+    def test_success_get(self):
+        os.makedirs(default_storage.path("tweet_thumbnails"))
+        destination = default_storage.path(thumbnail_name(self.digest, "{size}"))
+        render_thumbnails(default_storage.path(self.name), destination, settings.TWEET_THUMBNAIL_SIZES)
+        size = settings.TWEET_THUMBNAIL_SIZES[0]
+
+        response = self.client.get(reverse("tweets:thumbnail", kwargs={"digest": self.digest, "size": size}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        response.close()
+
+    def test_failure_get_before_thumbnails_are_ready(self):
+        size = settings.TWEET_THUMBNAIL_SIZES[0]
+        response = self.client.get(reverse("tweets:thumbnail", kwargs={"digest": self.digest, "size": size}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_delete_files_with_last_image(self):
+        os.makedirs(default_storage.path("tweet_thumbnails"))
+        destination = default_storage.path(thumbnail_name(self.digest, "{size}"))
+        render_thumbnails(default_storage.path(self.name), destination, settings.TWEET_THUMBNAIL_SIZES)
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        first, second = (Tweet.objects.create(user=user, content=f"tweet {i}") for i in range(2))
+        for tweet in (first, second):
+            TweetImage.objects.create(tweet=tweet, image=self.name, digest=self.digest)
+        size = settings.TWEET_THUMBNAIL_SIZES[0]
+        url = reverse("tweets:thumbnail", kwargs={"digest": self.digest, "size": size})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_tweets([first.pk])
+        self.assertTrue(default_storage.exists(self.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_tweets([second.pk])
+        self.assertFalse(default_storage.exists(self.name))
+        self.assertEqual(os.listdir(default_storage.path("tweet_thumbnails")), [])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_benchmark_requires_images(self):
+        with self.assertRaisesMessage(CommandError, "--count must be at least 1."):
+            call_command("benchmark_thumbnails", count=0, stdout=StringIO())
+
+    def test_failure_get_with_unknown_size(self):
+        response = self.client.get(reverse("tweets:thumbnail", kwargs={"digest": self.digest, "size": 7}))
+        self.assertEqual(response.status_code, 404)
+
+
+class TestTweetDetailView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.tweet = Tweet.objects.create(user=self.user, content="hello")
+
+    def test_success_get(self):
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": self.tweet.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "tweets/detail.html")
+        self.assertEqual(response.context["tweet"], self.tweet)
+
+    def test_success_get_archived_tweet(self):
+        Tweet.objects.filter(pk=self.tweet.pk).update(created_at=timezone.now() - timedelta(days=60))
+        call_command("archive_tweets", stdout=StringIO())
+
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": self.tweet.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["tweet"], ArchivedTweet.objects.get(pk=self.tweet.pk))
+
+    def test_failure_get_with_not_exist_tweet(self):
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": self.tweet.pk + 1}))
+        self.assertEqual(response.status_code, 404)
+
+
+class TestArchiveTweetsCommand(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    def test_archive_old_tweets_in_batches(self):
+        old_tweets = [Tweet.objects.create(user=self.user, content=f"old {i}") for i in range(3)]
+        new_tweet = Tweet.objects.create(user=self.user, content="new")
+        Tweet.objects.exclude(pk=new_tweet.pk).update(created_at=timezone.now() - timedelta(days=60))
+
+        out = StringIO()
+        call_command("archive_tweets", batch_size=2, stdout=out)
+
+        self.assertEqual(list(Tweet.objects.all()), [new_tweet])
+        self.assertQuerysetEqual(
+            ArchivedTweet.objects.order_by("pk").values_list("pk", flat=True), [tweet.pk for tweet in old_tweets]
+        )
+        self.assertIn("Archived 2 tweets", out.getvalue())
+        self.assertIn("Archived 3 tweets", out.getvalue())
+
+    def test_user_tweets_reads_archive_past_hot_window(self):
+        tweets = [Tweet.objects.create(user=self.user, content=f"tweet {i}") for i in range(4)]
+        Tweet.objects.filter(pk__in=[tweets[0].pk, tweets[1].pk]).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        call_command("archive_tweets", stdout=StringIO())
+
+        with self.assertNumQueries(1):
+            first_page = user_tweets(self.user, limit=2)
+        second_page = user_tweets(self.user, before=first_page[-1].pk, limit=2)
+        self.assertEqual([tweet.pk for tweet in first_page], [tweets[3].pk, tweets[2].pk])
+        self.assertEqual([tweet.pk for tweet in second_page], [tweets[1].pk, tweets[0].pk])
 
 
 # class TestTweetDeleteView(TestCase):
@@ -41,6 +512,92 @@ class TestHomeView(TestCase):
 #     def test_failure_post_with_incorrect_user(self):
 
 
+class TestTweetAdmin(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="testpassword")
+        self.user = User.objects.create_user(username="spammer", password="testpassword")
+        self.client.login(username="admin", password="testpassword")
+        self.tweets = [Tweet.objects.create(user=self.user, content=f"spam {i}") for i in range(5)]
+        self.url = reverse("admin:tweets_tweet_changelist")
+
+    @override_settings(ADMIN_COUNT_LIMIT=3)
+    def test_success_get_with_keyset_paging(self):
+        with mock.patch("tweets.admin.TweetAdmin.list_per_page", 2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context["cl"].result_list), [self.tweets[4], self.tweets[3]])
+            self.assertEqual(response.context["cl"].result_count, self.tweets[4].pk)
+            next_url = response.context["cl"].next_url
+            self.assertEqual(next_url, f"?id__lt={self.tweets[3].pk}")
+
+            response = self.client.get(self.url + next_url)
+            self.assertEqual(list(response.context["cl"].result_list), [self.tweets[2], self.tweets[1]])
+            self.assertEqual(response.context["cl"].result_count, self.tweets[4].pk)
+            self.assertEqual(response.context["cl"].count_kind, "upper_bound")
+            self.assertContains(response, f"最大 {self.tweets[4].pk} 件")
+
+    @override_settings(ADMIN_COUNT_LIMIT=10)
+    def test_filtered_count_ignores_cursor(self):
+        with mock.patch("tweets.admin.TweetAdmin.list_per_page", 2):
+            response = self.client.get(self.url, {"q": "spam", "id__lt": self.tweets[1].pk})
+        self.assertEqual(list(response.context["cl"].result_list), [self.tweets[0]])
+        self.assertEqual(response.context["cl"].result_count, 5)
+        self.assertEqual(response.context["cl"].count_kind, "exact")
+
+    def test_failure_get_with_invalid_cursor(self):
+        for cursor in ["abc", "99999999999999999999999", str(2**63), "0", "-1"]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"id__lt": cursor})
+                self.assertRedirects(response, self.url + "?e=1")
+
+    def test_success_get_with_prefix_search(self):
+        other = User.objects.create_user(username="other", password="testpassword")
+        Tweet.objects.create(user=other, content="hello")
+
+        response = self.client.get(self.url, {"q": "spam"})
+        self.assertEqual(len(response.context["cl"].result_list), 5)
+
+    @skipUnless(connection.vendor == "sqlite", "Checks the SQLite query plan")
+    def test_prefix_search_uses_index(self):
+        response = self.client.get(self.url, {"q": "spam"})
+        plan = response.context["cl"].queryset.explain()
+        self.assertIn(
+            "SEARCH accounts_user USING INDEX sqlite_autoindex_accounts_user_1 (username>? AND username<?)", plan
+        )
+        self.assertIn("SEARCH tweets_tweet USING INDEX", plan)
+        self.assertNotIn("SCAN", plan)
+
+    @override_settings(ADMIN_DELETE_BATCH_SIZE=2)
+    def test_delete_in_batches(self):
+        Like.objects.create(user=self.admin, tweet=self.tweets[0])
+        keep = Tweet.objects.create(user=self.admin, content="keep")
+        data = {"action": "delete_in_batches", "_selected_action": [tweet.pk for tweet in self.tweets]}
+
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "admin/delete_in_batches_confirmation.html")
+        self.assertEqual(response.context["count"], 5)
+        self.assertEqual(Tweet.objects.count(), 6)
+
+        with mock.patch("tweets.admin.delete_tweets", wraps=delete_tweets) as deleted:
+            response = self.client.post(self.url, {**data, "post": "yes"})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(deleted.call_count, 3)
+        self.assertEqual(list(Tweet.objects.all()), [keep])
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(LogEntry.objects.filter(action_flag=DELETION).count(), 5)
+
+    def test_delete_in_batches_across_pages(self):
+        data = {"action": "delete_in_batches", "_selected_action": [self.tweets[0].pk], "select_across": "1"}
+
+        response = self.client.post(self.url, data)
+        self.assertTrue(response.context["select_across"])
+        self.assertEqual(response.context["selected"], [])
+
+        self.client.post(self.url + "?q=spam", {**data, "post": "yes"})
+        self.assertFalse(Tweet.objects.exists())
+
+
 # class TestLikeView(TestCase):
 #     def test_success_post(self):
 
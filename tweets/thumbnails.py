@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = "tweet_images"
+THUMBNAIL_DIR = "tweet_thumbnails"
+# Pillow format names whose usual extension is not the lowercased name.
+EXTENSIONS = {"JPEG": ".jpg"}
+
+
+def thumbnail_name(digest, size):
+    return f"{THUMBNAIL_DIR}/{digest}-{size}.jpg"
+
+
+def store_image(uploaded_file, storage=default_storage):
+    """Save ``uploaded_file`` under its SHA-256 digest, reading it chunk by chunk.
+
+    ``uploaded_file`` must have been validated by ``forms.ImageField``; the extension
+    comes from the format Pillow detected there, not from the client's file name.
+    Returns the storage name and the hex digest.
+    """
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    image_format = uploaded_file.image.format
+    extension = EXTENSIONS.get(image_format, f".{image_format.lower()}")
+    name = f"{IMAGE_DIR}/{digest.hexdigest()}{extension}"
+    if not storage.exists(name):
+        name = storage.save(name, uploaded_file)
+    return name, digest.hexdigest()
+
+
+def delete_image_files(name, digest, storage=default_storage):
+    """Delete a stored image and its thumbnails, which are served by digest without a database lookup."""
+    storage.delete(name)
+    for size in settings.TWEET_THUMBNAIL_SIZES:
+        storage.delete(thumbnail_name(digest, size))
+
+
+def render_thumbnails(source, destination, sizes):
+    """Write a JPEG thumbnail of ``source`` to ``destination.format(size=size)`` for every size.
+
+    Runs in the worker processes, so it must not touch the database.
+    """
+    with Image.open(source) as image:
+        image.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        # Shrink from the largest size down so every step resizes an already small image.
+        for size in sorted(sizes, reverse=True):
+            image.thumbnail((size, size))
+            path = destination.format(size=size)
+            image.save(f"{path}.tmp", "JPEG", quality=85, optimize=True)
+            os.replace(f"{path}.tmp", path)
+    return destination
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return this process's render pool, started on first use.
+
+    Each server worker has a pool of its own, so the host runs
+    ``TWEET_THUMBNAIL_WORKERS`` render processes per server worker.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.TWEET_THUMBNAIL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def log_render_failure(source, future):
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Rendering thumbnails of %s failed", source, exc_info=exception)
+
+
+def submit_thumbnails(source, destination, sizes):
+    future = get_executor().submit(render_thumbnails, source, destination, sizes)
+    future.add_done_callback(partial(log_render_failure, source))
+    return future
+
+
+def schedule_thumbnails(tweet_image, storage=default_storage):
+    os.makedirs(storage.path(THUMBNAIL_DIR), exist_ok=True)
+    source = storage.path(tweet_image.image.name)
+    destination = storage.path(thumbnail_name(tweet_image.digest, "{size}"))
+    sizes = settings.TWEET_THUMBNAIL_SIZES
+    transaction.on_commit(lambda: submit_thumbnails(source, destination, sizes))
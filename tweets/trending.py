@@ -0,0 +1,145 @@
+import hashlib
+import re
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Min, Q, Sum
+
+from .models import HashtagCandidate, HashtagSketchCell
+
+HASHTAG_RE = re.compile(r"(?<!\w)[#＃](\w+)")
+TRENDING_KEY = "trending:top"
+SKETCH_WIDTH = 1024
+SKETCH_DEPTH = 4
+
+
+def extract_hashtags(content):
+    return list(dict.fromkeys(tag.lower() for tag in HASHTAG_RE.findall(content)))
+
+
+class CountMinSketch:
+    """Approximate counter whose estimates are never below the true count."""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.counts = array("I", [0]) * (width * depth)
+
+    def cells(self, key):
+        """Return the ``(row, column)`` counter of ``key`` in every row."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(row, (first + row * second) % self.width) for row in range(self.depth)]
+
+    def _indexes(self, key):
+        return [row * self.width + column for row, column in self.cells(key)]
+
+    def add(self, key, count=1):
+        indexes = self._indexes(key)
+        for index in indexes:
+            self.counts[index] += count
+        return min(self.counts[index] for index in indexes)
+
+    def estimate(self, key):
+        return min(self.counts[index] for index in self._indexes(key))
+
+
+class Bucket:
+    """Hashtag counts for one slice of the window, with the tags most likely to trend."""
+
+    def __init__(self):
+        self.sketch = CountMinSketch()
+        self.candidates = {}
+
+    def add(self, tag):
+        self.candidates[tag] = self.sketch.add(tag)
+        if len(self.candidates) > settings.TRENDING_SIZE * 4:
+            del self.candidates[min(self.candidates, key=self.candidates.get)]
+
+
+def bucket_seconds():
+    return settings.TRENDING_WINDOW // settings.TRENDING_BUCKETS
+
+
+def bucket_index(timestamp):
+    return int(timestamp // bucket_seconds())
+
+
+def window_buckets(now):
+    last = bucket_index(now)
+    return range(last - settings.TRENDING_BUCKETS + 1, last + 1)
+
+
+def record_hashtags(tweet):
+    """Count the hashtags of ``tweet`` in the bucket of its creation time.
+
+    The sketch counters are rows of ``HashtagSketchCell`` incremented with ``F()``,
+    so every worker process adds to the same counts without losing updates. The
+    buckets that slid out of the window are dropped in the same transaction, so
+    reading the trending hashtags never writes.
+    """
+    tags = extract_hashtags(tweet.content)
+    if not tags:
+        return
+    using = settings.TRENDING_DATABASE
+    bucket = bucket_index(tweet.created_at.timestamp())
+    sketch = CountMinSketch()
+    estimates = {}
+    with transaction.atomic(using=using):
+        start = window_buckets(tweet.created_at.timestamp()).start
+        HashtagSketchCell.objects.using(using).filter(bucket__lt=start).delete()
+        HashtagCandidate.objects.using(using).filter(bucket__lt=start).delete()
+        for tag in tags:
+            cells = sketch.cells(tag)
+            HashtagSketchCell.objects.using(using).bulk_create(
+                [HashtagSketchCell(bucket=bucket, row=row, column=column) for row, column in cells],
+                ignore_conflicts=True,
+            )
+            counters = HashtagSketchCell.objects.using(using).filter(
+                Q(*(Q(row=row, column=column) for row, column in cells), _connector=Q.OR), bucket=bucket
+            )
+            counters.update(count=F("count") + 1)
+            estimates[tag] = counters.aggregate(estimate=Min("count"))["estimate"]
+        HashtagCandidate.objects.using(using).bulk_create(
+            [HashtagCandidate(bucket=bucket, tag=tag, estimate=estimate) for tag, estimate in estimates.items()],
+            update_conflicts=True,
+            unique_fields=["bucket", "tag"],
+            update_fields=["estimate"],
+        )
+        # Only the tags most likely to trend are kept as candidates of a bucket.
+        candidates = HashtagCandidate.objects.using(using).filter(bucket=bucket)
+        dropped = list(
+            candidates.order_by("-estimate", "tag").values_list("pk", flat=True)[settings.TRENDING_SIZE * 4 :]
+        )
+        if dropped:
+            HashtagCandidate.objects.using(using).filter(pk__in=dropped).delete()
+
+
+def compute_trending(now=None):
+    now = time.time() if now is None else now
+    using = settings.TRENDING_DATABASE
+    scores = (
+        HashtagCandidate.objects.using(using)
+        .filter(bucket__in=window_buckets(now))
+        .values("tag")
+        .annotate(score=Sum("estimate"))
+        .order_by("-score", "tag")[: settings.TRENDING_SIZE]
+    )
+    trending = [(score["tag"], score["score"]) for score in scores]
+    cache.set(TRENDING_KEY, trending, settings.TRENDING_REFRESH)
+    return trending
+
+
+def get_trending():
+    """Return ``(hashtag, estimated count)`` pairs, most used first.
+
+    The result is cached per process for ``TRENDING_REFRESH`` seconds.
+    """
+    trending = cache.get(TRENDING_KEY)
+    if trending is None:
+        trending = compute_trending()
+    return trending
@@ -6,8 +6,9 @@ app_name = "tweets"
 
 urlpatterns = [
     path("home/", views.HomeView.as_view(), name="home"),
-    # path('create/', views.TweetCreateView.as_view(), name='create'),
-    # path('<int:pk>/', views.TweetDetailView.as_view(), name='detail'),
+    path("create/", views.TweetCreateView.as_view(), name="create"),
+    path("<int:pk>/", views.TweetDetailView.as_view(), name="detail"),
+    path("thumbnails/<slug:digest>-<int:size>.jpg", views.thumbnail, name="thumbnail"),
     # path('<int:pk>/delete/', views.TweetDeleteView.as_view(), name='delete'),
     # path('<int:pk>/like/', views.LikeView, name='like'),
     # path('<int:pk>/unlike/', views.UnlikeView, name='unlike'),
@@ -1,6 +1,61 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import TemplateView
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.urls import reverse_lazy
+from django.views.decorators.http import require_GET
+from django.views.generic import CreateView, DetailView, TemplateView
+
+from .archive import get_tweet
+from .forms import TweetCreateForm
+from .models import TweetImage
+from .thumbnails import schedule_thumbnails, store_image, thumbnail_name
+from .trending import get_trending
 
 
 class HomeView(LoginRequiredMixin, TemplateView):
     template_name = "tweets/home.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["trending"] = get_trending()
+        return context
+
+
+class TweetCreateView(LoginRequiredMixin, CreateView):
+    form_class = TweetCreateForm
+    template_name = "tweets/create.html"
+    success_url = reverse_lazy("tweets:home")
+
+    def form_valid(self, form):
+        form.instance.user = self.request.user
+        response = super().form_valid(form)
+        image = form.cleaned_data["image"]
+        if image:
+            name, digest = store_image(image)
+            schedule_thumbnails(TweetImage.objects.create(tweet=self.object, image=name, digest=digest))
+        return response
+
+
+class TweetDetailView(LoginRequiredMixin, DetailView):
+    template_name = "tweets/detail.html"
+    context_object_name = "tweet"
+
+    def get_object(self, queryset=None):
+        tweet = get_tweet(self.kwargs["pk"])
+        if tweet is None or not tweet.user.is_active:
+            raise Http404
+        return tweet
+
+
+@require_GET
+def thumbnail(request, digest, size):
+    # The URL is derived from the image digest, so the response never changes.
+    if size not in settings.TWEET_THUMBNAIL_SIZES:
+        raise Http404
+    try:
+        response = FileResponse(default_storage.open(thumbnail_name(digest, size)), content_type="image/jpeg")
+    except FileNotFoundError:
+        raise Http404
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response